@@ -1,12 +1,19 @@
 import asyncio
+import hashlib
+import json
 import os
+import random
 import sqlite3
+import threading
+import time
+from typing import NamedTuple
 
 import aiohttp
 import discord
-import requests
-from discord import Interaction, app_commands, ui
-from discord.ext import commands
+import orjson
+from aiolimiter import AsyncLimiter
+from discord import Interaction, ui
+from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -16,20 +23,147 @@ TOKEN = os.getenv("DISCORD_TOKEN")
 # API Endpoint
 OPENF1_DRIVERS_URL = "https://api.openf1.org/v1/drivers"
 OPENF1_MEETINGS_URL = "https://api.openf1.org/v1/meetings"
+OPENF1_TIMEOUT = aiohttp.ClientTimeout(total=10)
+# Client-side throttle and retry policy for OpenF1 requests
+OPENF1_LIMITER = AsyncLimiter(max_rate=4, time_period=1.0)
+OPENF1_MAX_ATTEMPTS = 5
+# How long a looked-up meeting key is reused before asking OpenF1 again. It
+# outlives F1_DATA_TTL_SECONDS so most refreshes only fetch the drivers.
+MEETING_KEY_TTL_SECONDS = 24 * 3600
 
 # Database file
 DB_FILE = "f1_picks.db"
 
-# A list to store F1 teams and drivers, which will be populated from the API
-F1_TEAMS = []
+# F1 data is cached on disk so restarts don't have to wait on OpenF1
+F1_CACHE_FILE = "f1_cache.json"
+# How long fetched F1 data is considered fresh before it is refreshed. Keep it
+# below MEETING_KEY_TTL_SECONDS so the cached meeting key is still reused.
+F1_DATA_TTL_SECONDS = 6 * 3600
+# Stale data younger than this is still served while a refresh runs in the background
+F1_DATA_MAX_AGE_SECONDS = 24 * 3600
+
+
+class F1DataCache:
+    """Holds the processed F1 teams list along with when it was fetched."""
+
+    def __init__(self, ttl_seconds=F1_DATA_TTL_SECONDS):
+        self.data = []
+        self.fetched_at = None
+        self.ttl_seconds = ttl_seconds
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def update(self, data, age_seconds=0):
+        """Replace the cached data. age_seconds is how old the data already is."""
+        self.data = data
+        self.fetched_at = time.monotonic() - age_seconds
+
+    def age(self):
+        """Return the number of seconds since the data was fetched, or None."""
+        if self.fetched_at is None:
+            return None
+        return time.monotonic() - self.fetched_at
+
+    def is_stale(self):
+        """Return True if the data has never been fetched or is older than the TTL."""
+        age = self.age()
+        return age is None or age >= self.ttl_seconds
+
+
+# F1 teams and drivers, which will be populated from the API
+F1_TEAMS = F1DataCache()
+# Lookups derived from F1_TEAMS, rebuilt whenever the data is fetched
+F1_TEAMS_BY_NAME = {}
+TOTAL_DRIVERS = 0
+# Prebuilt dropdown options, so views only filter them instead of rebuilding them.
+# Team options are indexed by the number of available drivers minus one, since
+# that count is shown in the option description.
+TEAM_SELECT_OPTIONS = {}
+DRIVER_OPTIONS_BY_TEAM = {}
+
+
+class Pick(NamedTuple):
+    """A user's saved pick, as read from the user_picks table."""
+
+    ea_username: str
+    team: str
+    driver: str
+
+
+# Long-lived database connection, opened by init_database()
+DB_CONN = None
+# Serializes access to DB_CONN, which is shared by the worker threads
+DB_LOCK = threading.Lock()
+
+# In-memory mirror of the drivers stored in user_picks. It is loaded by
+# init_database(), kept in sync by save_user_picks(), and reloaded by
+# reload_selected_drivers() after another process (db_reset.py, seed_database.py)
+# writes to the database, so UI code can check driver availability without
+# querying the database. Those run in worker threads, so they never change the
+# set in place: they build a new frozenset and rebind the name in one step.
+SELECTED_DRIVERS = frozenset()
+# PRAGMA data_version when SELECTED_DRIVERS was last loaded. It only changes
+# when another connection commits, so the bot's own writes don't bump it.
+SELECTED_DRIVERS_DATA_VERSION = None
+
+# Current database schema version, stored in PRAGMA user_version
+SCHEMA_VERSION = 1
+
+# Discord caps embed descriptions at 4096 characters, so the leaderboard only
+# shows the most recent picks
+LEADERBOARD_LIMIT = 50
+
+# SQL statements are kept as constants so sqlite3's statement cache reuses them.
+#
+# SQL_SAVE_PICK inserts or updates a user's pick in one statement. The row is
+# only produced if no other user holds the driver, so a taken driver matches no
+# row whether or not the unique driver index exists.
+SQL_SAVE_PICK = """
+    INSERT INTO user_picks (user_id, ea_username, team, driver, updated_at)
+    SELECT ?1, ?2, ?3, ?4, CURRENT_TIMESTAMP
+    WHERE NOT EXISTS (
+        SELECT 1 FROM user_picks WHERE driver = ?4 AND user_id <> ?1
+    )
+    ON CONFLICT(user_id) DO UPDATE SET
+        ea_username = excluded.ea_username,
+        team = excluded.team,
+        driver = excluded.driver,
+        updated_at = CURRENT_TIMESTAMP
+"""
+SQL_GET_USER_DRIVER = "SELECT driver FROM user_picks WHERE user_id = ?"
+# Pick columns are selected in Pick field order
+SQL_GET_USER_PICK = "SELECT ea_username, team, driver FROM user_picks WHERE user_id = ?"
+SQL_GET_SELECTED_DRIVERS = "SELECT driver FROM user_picks"
+SQL_GET_DUPLICATE_DRIVERS = """
+    SELECT driver, GROUP_CONCAT(ea_username || ' (' || user_id || ')', ', ')
+    FROM user_picks GROUP BY driver HAVING COUNT(*) > 1
+"""
+SQL_GET_LEADERBOARD = (
+    "SELECT ea_username, team, driver FROM user_picks ORDER BY updated_at DESC LIMIT ?"
+)
+SQL_GET_META = "SELECT v, ts FROM meta WHERE k = ?"
+SQL_SET_META = "INSERT OR REPLACE INTO meta (k, v, ts) VALUES (?, ?, ?)"
 
 
 def init_database():
-    """Initialize the SQLite database and create the user_picks table if it doesn't exist."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    """Open the database connection and create the user_picks table if it doesn't exist."""
+    global DB_CONN, SELECTED_DRIVERS_DATA_VERSION
 
-    cursor.execute(
+    if DB_CONN is not None:
+        DB_CONN.close()
+    DB_CONN = sqlite3.connect(
+        DB_FILE, check_same_thread=False, isolation_level=None, cached_statements=128
+    )
+    DB_CONN.execute("PRAGMA journal_mode=WAL")
+    DB_CONN.execute("PRAGMA synchronous=NORMAL")
+    DB_CONN.execute("PRAGMA temp_store=MEMORY")
+    DB_CONN.execute("PRAGMA cache_size=-8000")  # 8 MB page cache
+
+    DB_CONN.execute(
         """
         CREATE TABLE IF NOT EXISTS user_picks (
             user_id INTEGER PRIMARY KEY,
@@ -41,144 +175,512 @@ def init_database():
     """
     )
 
-    # Check if ea_username column exists, if not add it (for existing databases)
-    cursor.execute("PRAGMA table_info(user_picks)")
-    columns = [column[1] for column in cursor.fetchall()]
-    if "ea_username" not in columns:
-        cursor.execute(
-            'ALTER TABLE user_picks ADD COLUMN ea_username TEXT DEFAULT "Unknown"'
+    # Migrate databases older than SCHEMA_VERSION. Databases created before
+    # versioning report 0, so they are checked for the ea_username column once.
+    (user_version,) = DB_CONN.execute("PRAGMA user_version").fetchone()
+    if user_version < 1:
+        columns = [
+            column[1] for column in DB_CONN.execute("PRAGMA table_info(user_picks)")
+        ]
+        if "ea_username" not in columns:
+            DB_CONN.execute(
+                'ALTER TABLE user_picks ADD COLUMN ea_username TEXT DEFAULT "Unknown"'
+            )
+            print("Added ea_username column to existing database.")
+    if user_version < SCHEMA_VERSION:
+        DB_CONN.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # Small key/value store for state the bot keeps between restarts
+    DB_CONN.execute(
+        "CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT, ts INTEGER)"
+    )
+
+    # Each driver can only be picked by one user; the unique index also serves
+    # the driver lookups. The updated_at index returns leaderboard rows in order.
+    try:
+        DB_CONN.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_user_picks_driver ON user_picks(driver)"
         )
-        print("Added ea_username column to existing database.")
+    except sqlite3.IntegrityError:
+        # Older databases can hold the same driver twice. SQL_SAVE_PICK still
+        # refuses taken drivers without the index, so keep running and report it.
+        print(
+            "Warning: some drivers are picked by more than one user, so the unique "
+            "driver index was not created. Fix these picks (e.g. with db_reset.py) "
+            "and restart the bot:"
+        )
+        for driver, users in DB_CONN.execute(SQL_GET_DUPLICATE_DRIVERS):
+            print(f"  {driver}: {users}")
+    DB_CONN.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_picks_updated "
+        "ON user_picks(updated_at DESC)"
+    )
+
+    # Gather query planner statistics until there are some. ANALYZE on an empty
+    # table creates sqlite_stat1 without any rows, so check for rows, not the table.
+    has_stats = DB_CONN.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    ).fetchone()
+    if has_stats:
+        has_stats = DB_CONN.execute("SELECT 1 FROM sqlite_stat1 LIMIT 1").fetchone()
+    if not has_stats:
+        DB_CONN.execute("ANALYZE")
+
+    SELECTED_DRIVERS_DATA_VERSION = None
+    reload_selected_drivers()
 
-    conn.commit()
-    conn.close()
     print("Database initialized successfully.")
 
 
-def save_user_pick(user_id, ea_username, team, driver):
-    """Save or update a user's team, driver pick, and EA username in the database."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+def save_user_picks(picks):
+    """
+    Save a batch of (user_id, ea_username, team, driver) picks in one transaction.
+    Returns a list with True for each pick that was saved, in order.
+    """
+    global SELECTED_DRIVERS
+
+    results = []
+    changes = []
+    with DB_LOCK:
+        with DB_CONN:
+            DB_CONN.execute("BEGIN IMMEDIATE")
+            for user_id, ea_username, team, driver in picks:
+                old_pick = DB_CONN.execute(SQL_GET_USER_DRIVER, (user_id,)).fetchone()
+                try:
+                    cursor = DB_CONN.execute(
+                        SQL_SAVE_PICK, (user_id, ea_username, team, driver)
+                    )
+                    saved = cursor.rowcount > 0
+                except sqlite3.IntegrityError:
+                    saved = False  # Driver already taken by another user
 
-    # Check if the driver is already selected by another user
-    cursor.execute(
-        "SELECT user_id FROM user_picks WHERE driver = ? AND user_id != ?",
-        (driver, user_id),
-    )
-    existing_pick = cursor.fetchone()
+                if saved:
+                    changes.append((old_pick[0] if old_pick else None, driver))
+                results.append(saved)
 
-    if existing_pick:
-        conn.close()
-        return False  # Driver already taken by another user
+        # Only mirror the changes once the transaction has committed
+        if changes:
+            selected = set(SELECTED_DRIVERS)
+            for old_driver, driver in changes:
+                if old_driver:
+                    selected.discard(old_driver)
+                selected.add(driver)
+            SELECTED_DRIVERS = frozenset(selected)
+    return results
 
-    cursor.execute(
-        """
-        INSERT OR REPLACE INTO user_picks (user_id, ea_username, team, driver, updated_at)
-        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-    """,
-        (user_id, ea_username, team, driver),
-    )
 
-    conn.commit()
-    conn.close()
-    return True  # Successfully saved
+def save_user_pick(user_id, ea_username, team, driver):
+    """Save or update a user's team, driver pick, and EA username in the database."""
+    return save_user_picks([(user_id, ea_username, team, driver)])[0]
 
 
 def get_user_pick(user_id):
     """Retrieve a user's pick from the database."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "SELECT team, driver, ea_username FROM user_picks WHERE user_id = ?", (user_id,)
-    )
-    result = cursor.fetchone()
-
-    conn.close()
+    with DB_LOCK:
+        result = DB_CONN.execute(SQL_GET_USER_PICK, (user_id,)).fetchone()
 
     if result:
-        return {"team": result[0], "driver": result[1], "ea_username": result[2]}
+        return Pick(*result)
     return None
 
 
-def get_all_picks():
-    """Retrieve all user picks from the database."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+def render_leaderboard():
+    """Return the leaderboard embed text, one line per pick, most recent first."""
+    with DB_LOCK:
+        cursor = DB_CONN.execute(SQL_GET_LEADERBOARD, (LEADERBOARD_LIMIT,))
+        return "\n".join(
+            f"**{ea_username}:** {team} / {driver}"
+            for ea_username, team, driver in cursor
+        )
 
-    cursor.execute(
-        "SELECT user_id, team, driver, ea_username FROM user_picks ORDER BY updated_at DESC"
-    )
-    results = cursor.fetchall()
 
-    conn.close()
+def reload_selected_drivers():
+    """
+    Reload SELECTED_DRIVERS from the database if another process has written
+    to it since the last load. Returns True if the set was reloaded.
+    """
+    global SELECTED_DRIVERS, SELECTED_DRIVERS_DATA_VERSION
 
-    picks = {}
-    for user_id, team, driver, ea_username in results:
-        picks[user_id] = {"ea_username": ea_username, "team": team, "driver": driver}
+    with DB_LOCK:
+        (data_version,) = DB_CONN.execute("PRAGMA data_version").fetchone()
+        if data_version == SELECTED_DRIVERS_DATA_VERSION:
+            return False
 
-    return picks
+        cursor = DB_CONN.execute(SQL_GET_SELECTED_DRIVERS)
+        SELECTED_DRIVERS = frozenset(driver for (driver,) in cursor)
+        SELECTED_DRIVERS_DATA_VERSION = data_version
+    return True
 
 
 def get_selected_drivers():
     """Retrieve all currently selected drivers from the database."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    with DB_LOCK:
+        cursor = DB_CONN.execute(SQL_GET_SELECTED_DRIVERS)
+        return {driver[0] for driver in cursor}  # Return a set of selected drivers
+
+
+def get_meta(key):
+    """Return the (value, timestamp) stored for key in the meta table, or None."""
+    with DB_LOCK:
+        return DB_CONN.execute(SQL_GET_META, (key,)).fetchone()
+
 
-    cursor.execute("SELECT driver FROM user_picks")
-    results = cursor.fetchall()
+def set_meta(key, value):
+    """Store value for key in the meta table, stamped with the current time."""
+    with DB_LOCK:
+        DB_CONN.execute(SQL_SET_META, (key, value, int(time.time())))
 
-    conn.close()
 
-    return {driver[0] for driver in results}  # Return a set of selected drivers
+# Picks waiting for flush_picks() to write them, as (pick, future) pairs. It is
+# created in setup_hook so that it belongs to the bot's event loop.
+PICK_QUEUE = None
+# Most picks written in one transaction
+PICK_BATCH_SIZE = 100
+
+
+async def asave_user_pick(user_id, ea_username, team, driver):
+    """Queue a pick for the next batched write and wait until it is saved."""
+    future = asyncio.get_running_loop().create_future()
+    await PICK_QUEUE.put(((user_id, ea_username, team, driver), future))
+    return await future
+
+
+@tasks.loop(seconds=0.1)
+async def flush_picks():
+    """
+    Write the queued picks in a single transaction, so a burst of /pick
+    commands commits once instead of once per pick.
+    """
+    batch = []
+    while len(batch) < PICK_BATCH_SIZE and not PICK_QUEUE.empty():
+        batch.append(PICK_QUEUE.get_nowait())
+    if not batch:
+        return
+
+    try:
+        results = await asyncio.to_thread(save_user_picks, [pick for pick, _ in batch])
+    except Exception as e:
+        print(f"Error saving {len(batch)} picks: {e}")
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(e)
+        return
+
+    for (_, future), saved in zip(batch, results):
+        if not future.done():
+            future.set_result(saved)
+
+
+# Async variants of the helpers above, which run the query in a worker thread
+# so disk I/O never blocks the event loop
+async def aget_user_pick(user_id):
+    return await asyncio.to_thread(get_user_pick, user_id)
+
+
+async def arender_leaderboard():
+    return await asyncio.to_thread(render_leaderboard)
+
+
+async def aget_meta(key):
+    return await asyncio.to_thread(get_meta, key)
+
+
+async def aset_meta(key, value):
+    return await asyncio.to_thread(set_meta, key, value)
+
+
+async def areload_selected_drivers():
+    return await asyncio.to_thread(reload_selected_drivers)
 
 
 # Set up the bot with necessary intents
 intents = discord.Intents.default()
 intents.message_content = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
 
+class F1Bot(commands.Bot):
+    """
+    Bot subclass that owns the shared HTTP session used for OpenF1 requests and
+    does its one-time startup work in setup_hook, which unlike on_ready does not
+    run again on every gateway reconnect.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.http_session = None
+
+    async def setup_hook(self):
+        global PICK_QUEUE
+
+        # Create the session inside a running event loop and keep it for the
+        # lifetime of the bot so requests to OpenF1 reuse pooled connections
+        self.http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=10, limit_per_host=8, ttl_dns_cache=300, keepalive_timeout=75
+            ),
+            timeout=OPENF1_TIMEOUT,
+            # Error statuses raise ClientResponseError, which fetch_openf1_json retries
+            raise_for_status=True,
+        )
+        # The F1 data refresh reads cached state from the database
+        init_database()
+        # Serve the last fetched F1 data right away; the refresh loop below
+        # only hits OpenF1 if it is stale
+        load_f1_cache()
+        await self.sync_commands_if_changed()
+        # Fetches F1 data now and keeps it fresh in the background
+        refresh_f1_data.start()
+        # Picks from /pick are queued and written in batches
+        PICK_QUEUE = asyncio.Queue()
+        flush_picks.start()
+
+    async def sync_commands_if_changed(self):
+        """
+        Sync the slash commands with Discord, skipping the sync if they are
+        unchanged since the last successful one. Syncing is heavily rate limited.
+        """
+        commands_payload = json.dumps(
+            [command.to_dict(self.tree) for command in self.tree.get_commands()],
+            sort_keys=True,
+        )
+        commands_hash = hashlib.sha256(commands_payload.encode()).hexdigest()
+
+        synced_hash = await aget_meta("command_hash")
+        if synced_hash and synced_hash[0] == commands_hash:
+            print("Commands unchanged since last sync, skipping sync.")
+            return
+
+        try:
+            synced = await self.tree.sync()
+            print(f"Synced {len(synced)} command(s).")
+            await aset_meta("command_hash", commands_hash)
+        except Exception as e:
+            print(f"Failed to sync commands: {e}")
+
+    async def close(self):
+        if PICK_QUEUE is not None:
+            flush_picks.stop()
+            # Write any picks still waiting in the queue before shutting down
+            while not PICK_QUEUE.empty():
+                await flush_picks()
+        if self.http_session is not None:
+            await self.http_session.close()
+        await super().close()
 
-async def fetch_f1_data():
+
+bot = F1Bot(command_prefix="!", intents=intents)
+
+
+def parse_retry_after(headers):
+    """Return the Retry-After header in seconds, or None if it is missing or invalid."""
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+async def fetch_openf1_json(session, url, params):
     """
-    Fetches F1 team and driver data from the OpenF1 API and populates the F1_TEAMS list.
+    GET an OpenF1 endpoint and return the decoded JSON.
+
+    Requests go through OPENF1_LIMITER, and rate limit responses, server errors
+    and connection failures are retried with exponential backoff. The session
+    must be created with raise_for_status=True so error statuses raise.
     """
-    global F1_TEAMS
+    for attempt in range(1, OPENF1_MAX_ATTEMPTS + 1):
+        try:
+            async with OPENF1_LIMITER:
+                async with session.get(url, params=params) as response:
+                    # orjson parses the raw bytes, skipping the str decode as well
+                    data = orjson.loads(await response.read())
+
+                    # Back off before the next request if the quota is nearly used up
+                    quota_delay = None
+                    remaining = response.headers.get("x-ratelimit-remaining")
+                    if remaining is not None and remaining.isdigit():
+                        if int(remaining) < 2:
+                            quota_delay = parse_retry_after(response.headers) or 1.0
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status = getattr(e, "status", None)
+            retryable = status is None or status == 429 or status >= 500
+            if not retryable or attempt == OPENF1_MAX_ATTEMPTS:
+                raise
+
+            delay = 2**attempt + random.uniform(0, 1)
+            if status == 429:
+                delay = max(delay, parse_retry_after(e.headers or {}) or 0)
+            print(
+                f"OpenF1 request to {url} failed ({e}), retrying in {delay:.1f}s "
+                f"(attempt {attempt}/{OPENF1_MAX_ATTEMPTS})"
+            )
+            await asyncio.sleep(delay)
+            continue
+
+        # Sleep only after the response is released, so its pooled connection
+        # isn't held for the whole backoff
+        if quota_delay:
+            await asyncio.sleep(quota_delay)
+        return data
 
+
+def set_f1_teams(teams, age_seconds=0):
+    """
+    Store the grouped teams in the F1_TEAMS cache and rebuild the lookups and
+    dropdown options derived from them. age_seconds is how old the data already is.
+    """
+    global F1_TEAMS_BY_NAME, TOTAL_DRIVERS, TEAM_SELECT_OPTIONS, DRIVER_OPTIONS_BY_TEAM
+
+    # Convert sets back to sorted lists for consistency, keeping a frozen
+    # copy of the set for availability checks
+    for team in teams:
+        team["drivers_set"] = frozenset(team["drivers"])
+        team["drivers"] = sorted(team["drivers"])
+
+    # Convert the dictionary back to a list, sorted alphabetically by team
+    F1_TEAMS.update(sorted(teams, key=lambda x: x["name"]), age_seconds)
+    F1_TEAMS_BY_NAME = {team["name"]: team for team in F1_TEAMS}
+    TOTAL_DRIVERS = sum(len(team["drivers"]) for team in F1_TEAMS)
+    TEAM_SELECT_OPTIONS = {
+        team["name"]: tuple(
+            discord.SelectOption(
+                label=team["name"],
+                value=team["name"],
+                description=f"{count} driver{'s' if count != 1 else ''} available",
+            )
+            for count in range(1, len(team["drivers"]) + 1)
+        )
+        for team in F1_TEAMS
+    }
+    DRIVER_OPTIONS_BY_TEAM = {
+        team["name"]: tuple(
+            discord.SelectOption(label=driver, value=driver)
+            for driver in team["drivers"]
+        )
+        for team in F1_TEAMS
+    }
+
+
+def save_f1_cache():
+    """Write the current teams and drivers to the on-disk cache."""
+    cache = {
+        "ts": time.time(),
+        "teams": [
+            {"name": team["name"], "drivers": team["drivers"]} for team in F1_TEAMS
+        ],
+    }
+    # Write to a temporary file first so a crash never leaves a partial cache
+    temp_file = f"{F1_CACHE_FILE}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as cache_file:
+        json.dump(cache, cache_file)
+    os.replace(temp_file, F1_CACHE_FILE)
+
+
+def load_f1_cache():
+    """
+    Load teams and drivers from the on-disk cache, if there is a usable one.
+    A missing or malformed cache is ignored, and the refresh loop fetches
+    fresh data instead.
+    """
+    try:
+        with open(F1_CACHE_FILE, encoding="utf-8") as cache_file:
+            cache = json.load(cache_file)
+        age_seconds = max(0, time.time() - cache["ts"])
+        # Rebuild the teams from the expected fields only, failing on anything else
+        teams = [
+            {"name": team["name"], "drivers": team["drivers"]}
+            for team in cache["teams"]
+        ]
+        if not all(
+            isinstance(team["name"], str)
+            and isinstance(team["drivers"], list)
+            and all(isinstance(driver, str) for driver in team["drivers"])
+            for team in teams
+        ):
+            raise ValueError("teams need a name and a list of driver names")
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Ignoring unreadable F1 data cache: {e!r}")
+        return
+
+    if teams:
+        set_f1_teams(teams, age_seconds)
+        print(f"Loaded cached F1 data for {len(F1_TEAMS)} teams.")
+
+
+async def fetch_f1_data(session):
+    """
+    Fetches F1 team and driver data from the OpenF1 API and populates the F1_TEAMS cache.
+    If the fetch fails, the previously cached data is kept.
+    """
     print("Fetching F1 data from OpenF1 API...")
     try:
-        async with aiohttp.ClientSession() as session:
-            # Get the latest meeting key to ensure we have the most current data
-            async with session.get(
-                f"{OPENF1_MEETINGS_URL}?year=2025&country_name=Spain", timeout=10
-            ) as meetings_response:
-                meetings_response.raise_for_status()
-                meetings_data = await meetings_response.json()
-
-                if not meetings_data:
-                    print("Could not find latest meeting data from API.")
-                    raise Exception("No meetings data found")
-
-                latest_meeting_key = meetings_data[0]["meeting_key"]
-
-            # Fetch all drivers for the latest meeting
-            async with session.get(
-                f"{OPENF1_DRIVERS_URL}?meeting_key={latest_meeting_key}", timeout=10
-            ) as drivers_response:
-                drivers_response.raise_for_status()
-                drivers_data = await drivers_response.json()
-
-                if not drivers_data:
-                    print("No driver data found for the latest meeting.")
-                    raise Exception("No drivers data found")
+        # Reuse the meeting key from a recent lookup, otherwise get the latest
+        # meeting key to ensure we have the most current data
+        cached_meeting_key = await aget_meta("meeting_key")
+        drivers_data = None
+        speculative_meeting_key = None
+        speculative_drivers = None
+        if (
+            cached_meeting_key
+            and time.time() - cached_meeting_key[1] < MEETING_KEY_TTL_SECONDS
+        ):
+            latest_meeting_key = int(cached_meeting_key[0])
+        else:
+            meetings_request = fetch_openf1_json(
+                session, OPENF1_MEETINGS_URL, {"year": 2025, "country_name": "Spain"}
+            )
+            if cached_meeting_key:
+                # The meeting rarely changes, so fetch the drivers for the last
+                # known meeting alongside the lookup and keep them if it still matches
+                speculative_meeting_key = int(cached_meeting_key[0])
+                meetings_data, speculative_drivers = await asyncio.gather(
+                    meetings_request,
+                    fetch_openf1_json(
+                        session,
+                        OPENF1_DRIVERS_URL,
+                        {"meeting_key": speculative_meeting_key},
+                    ),
+                    return_exceptions=True,
+                )
+                if isinstance(meetings_data, BaseException):
+                    raise meetings_data
+            else:
+                meetings_data = await meetings_request
+
+            if not meetings_data:
+                print("Could not find latest meeting data from API.")
+                raise Exception("No meetings data found")
+
+            latest_meeting_key = meetings_data[0].get("meeting_key")
+            # Only a real key is stored, since it is reused until the TTL expires
+            if not isinstance(latest_meeting_key, int):
+                raise Exception(f"Invalid meeting key {latest_meeting_key!r}")
+            await aset_meta("meeting_key", str(latest_meeting_key))
+
+            if latest_meeting_key == speculative_meeting_key and not isinstance(
+                speculative_drivers, BaseException
+            ):
+                drivers_data = speculative_drivers
+
+        # Fetch all drivers for the latest meeting
+        if drivers_data is None:
+            drivers_data = await fetch_openf1_json(
+                session, OPENF1_DRIVERS_URL, {"meeting_key": latest_meeting_key}
+            )
+
+        if not drivers_data:
+            print("No driver data found for the latest meeting.")
+            raise Exception("No drivers data found")
 
         # Process the data to group drivers by team (ensuring no duplicates)
         teams_dict = {}
         for driver in drivers_data:
             team_name = driver.get("team_name")
-            driver_full_name = (
-                f"{driver.get('first_name', '')} {driver.get('last_name', '')}".strip()
+            first_name = (driver.get("first_name") or "").strip()
+            last_name = (driver.get("last_name") or "").strip()
+            driver_full_name = " ".join(
+                name for name in (first_name, last_name) if name
             )
 
             if team_name and driver_full_name:
@@ -187,13 +689,8 @@ async def fetch_f1_data():
                 # Use a set to automatically prevent duplicates
                 teams_dict[team_name]["drivers"].add(driver_full_name)
 
-        # Convert sets back to sorted lists for consistency
-        for team in teams_dict.values():
-            team["drivers"] = sorted(list(team["drivers"]))
-
-        # Convert the dictionary back to a list
-        F1_TEAMS = list(teams_dict.values())
-        F1_TEAMS.sort(key=lambda x: x["name"])  # Sort teams alphabetically
+        set_f1_teams(list(teams_dict.values()))
+        await asyncio.to_thread(save_f1_cache)
         print(f"Successfully fetched and processed data for {len(F1_TEAMS)} teams.")
 
     except Exception as e:
@@ -209,6 +706,82 @@ async def fetch_f1_data():
     print("F1 data loaded. Teams and drivers are ready.")
 
 
+# Future for the F1 data fetch currently in flight, if any. Callers that arrive
+# while a fetch is running wait for it instead of starting their own.
+F1_FETCH_IN_PROGRESS = None
+
+
+async def coalesced_fetch_f1_data():
+    """Fetch F1 data, sharing a single request between concurrent callers."""
+    global F1_FETCH_IN_PROGRESS
+
+    if F1_FETCH_IN_PROGRESS is not None:
+        # Shield the shared future so a cancelled waiter doesn't cancel it for everyone
+        await asyncio.shield(F1_FETCH_IN_PROGRESS)
+        return
+
+    F1_FETCH_IN_PROGRESS = asyncio.get_running_loop().create_future()
+    try:
+        await fetch_f1_data(bot.http_session)
+    finally:
+        F1_FETCH_IN_PROGRESS.set_result(None)
+        F1_FETCH_IN_PROGRESS = None
+
+
+# Background refresh started by ensure_f1_data_fresh(), kept so it isn't garbage collected
+F1_BACKGROUND_REFRESH = None
+
+
+@tasks.loop(hours=1)
+async def refresh_f1_data():
+    """Periodically refresh the F1 data once it is stale so it never goes stale silently."""
+    if F1_TEAMS.is_stale():
+        await coalesced_fetch_f1_data()
+
+
+def start_background_refresh():
+    """Start refreshing the F1 data in the background unless a refresh is running."""
+    global F1_BACKGROUND_REFRESH
+
+    if F1_BACKGROUND_REFRESH is None or F1_BACKGROUND_REFRESH.done():
+        F1_BACKGROUND_REFRESH = asyncio.create_task(coalesced_fetch_f1_data())
+
+
+async def ensure_f1_data_fresh(wait=True):
+    """
+    Refresh the F1 data if the cached copy has outlived its TTL. Data that is
+    stale but not too old is served as is while it refreshes in the background,
+    otherwise the caller waits for the refresh. Callers that can't wait, because
+    they haven't responded to the interaction yet, pass wait=False and always
+    get a background refresh.
+    """
+    if not F1_TEAMS.is_stale():
+        return
+
+    age = F1_TEAMS.age()
+    if not wait or (age is not None and age < F1_DATA_MAX_AGE_SECONDS):
+        start_background_refresh()
+        return
+
+    await coalesced_fetch_f1_data()
+
+
+# Discord allows at most 25 options in a select menu
+MAX_SELECT_OPTIONS = 25
+MORE_OPTIONS_VALUE = "__more__"
+
+
+def paginate_options(options, more_label):
+    """
+    Return the options to show on one page of a select menu. If they don't all
+    fit, the last slot becomes a "more" entry that opens the next page.
+    """
+    if len(options) <= MAX_SELECT_OPTIONS:
+        return options
+    more_option = discord.SelectOption(label=more_label, value=MORE_OPTIONS_VALUE)
+    return options[: MAX_SELECT_OPTIONS - 1] + [more_option]
+
+
 # Modal for collecting EA username
 class EAUsernameModal(ui.Modal, title="Enter Your EA Username"):
     def __init__(self):
@@ -222,6 +795,7 @@ class EAUsernameModal(ui.Modal, title="Enter Your EA Username"):
     )
 
     async def on_submit(self, interaction: Interaction):
+        await areload_selected_drivers()
         # Start the team selection process after getting EA username
         if not F1_TEAMS:
             await interaction.response.send_message(
@@ -231,9 +805,7 @@ class EAUsernameModal(ui.Modal, title="Enter Your EA Username"):
             return
 
         # Check if there are any available drivers left
-        selected_drivers = get_selected_drivers()
-        total_drivers = sum(len(team.get("drivers", [])) for team in F1_TEAMS)
-        available_count = total_drivers - len(selected_drivers)
+        available_count = TOTAL_DRIVERS - len(SELECTED_DRIVERS)
 
         if available_count == 0:
             await interaction.response.send_message(
@@ -253,12 +825,12 @@ class EAUsernameModal(ui.Modal, title="Enter Your EA Username"):
 
 # A View for selecting the F1 Team using a dropdown menu
 class TeamSelectView(ui.View):
-    def __init__(self, ea_username):
+    def __init__(self, ea_username, team_options=None):
         super().__init__()
         self.team = None
         self.ea_username = ea_username
 
-        if not F1_TEAMS:
+        if team_options is None and not F1_TEAMS:
             # Create a dummy option when no data is available
             error_options = [
                 discord.SelectOption(
@@ -270,35 +842,23 @@ class TeamSelectView(ui.View):
             self.team_select_callback.disabled = True
             return
 
-        # Get currently selected drivers to check which teams have available drivers
-        selected_drivers = get_selected_drivers()
-
-        # Create team options from F1_TEAMS data, ensuring unique team names
-        # and showing only teams with available drivers
-        seen_teams = set()
-        team_options = []
-        for team in F1_TEAMS:
-            name = team.get("name")
-            if name and name not in seen_teams:  # Ensure team has a name and is unique
-                # Check if team has any available drivers
-                available_drivers = [
-                    driver
-                    for driver in team.get("drivers", [])
-                    if driver not in selected_drivers
-                ]
-                if available_drivers:  # Only show teams with available drivers
-                    driver_count = len(available_drivers)
-                    description = f"{driver_count} driver{'s' if driver_count != 1 else ''} available"
+        # Show only teams with available drivers, using the prebuilt options.
+        # Later pages are given the remaining options instead of filtering again.
+        if team_options is None:
+            team_options = []
+            for team in F1_TEAMS:
+                available_count = len(team["drivers_set"] - SELECTED_DRIVERS)
+                if available_count:
                     team_options.append(
-                        discord.SelectOption(
-                            label=name, value=name, description=description
-                        )
+                        TEAM_SELECT_OPTIONS[team["name"]][available_count - 1]
                     )
-                    seen_teams.add(name)
+        self.team_options = team_options
 
         # Only add the select if we have valid options
         if team_options:
-            self.team_select_callback.options = team_options
+            self.team_select_callback.options = paginate_options(
+                team_options, "More teams ▶"
+            )
         else:
             # Fallback if no valid team options
             error_options = [
@@ -325,15 +885,20 @@ class TeamSelectView(ui.View):
             self.stop()
             return
 
+        # Show the next page of teams
+        if selected_value == MORE_OPTIONS_VALUE:
+            next_view = TeamSelectView(
+                self.ea_username, self.team_options[MAX_SELECT_OPTIONS - 1 :]
+            )
+            await interaction.response.edit_message(view=next_view)
+            self.stop()
+            return
+
         self.team = selected_value
-        selected_team_data = next(
-            (team for team in F1_TEAMS if team["name"] == self.team), None
-        )
+        selected_team_data = F1_TEAMS_BY_NAME.get(self.team)
 
         if selected_team_data and selected_team_data.get("drivers"):
-            driver_view = DriverSelectView(
-                self.ea_username, self.team, selected_team_data["drivers"]
-            )
+            driver_view = DriverSelectView(self.ea_username, self.team)
             await interaction.response.edit_message(
                 content=f"You have selected **{self.team}**. Now, please choose your driver:",
                 view=driver_view,
@@ -348,26 +913,26 @@ class TeamSelectView(ui.View):
 
 # A View for selecting the F1 Driver using a dropdown menu
 class DriverSelectView(ui.View):
-    def __init__(self, ea_username, team_name, drivers):
+    def __init__(self, ea_username, team_name, driver_options=None):
         super().__init__()
         self.ea_username = ea_username
         self.team_name = team_name
 
-        # Get currently selected drivers to filter them out
-        selected_drivers = get_selected_drivers()
-
-        # Create driver options with proper validation, ensuring unique driver names
-        # and filtering out already selected drivers
-        seen_drivers = set()
-        driver_options = []
-        for driver in drivers:
-            if driver and driver not in seen_drivers and driver not in selected_drivers:
-                driver_options.append(discord.SelectOption(label=driver, value=driver))
-                seen_drivers.add(driver)
+        # Filter the prebuilt options down to drivers nobody has selected yet.
+        # Later pages are given the remaining options instead of filtering again.
+        if driver_options is None:
+            driver_options = [
+                option
+                for option in DRIVER_OPTIONS_BY_TEAM.get(team_name, ())
+                if option.value not in SELECTED_DRIVERS
+            ]
+        self.driver_options = driver_options
 
         # Only add the select if we have valid options
         if driver_options:
-            self.driver_select_callback.options = driver_options
+            self.driver_select_callback.options = paginate_options(
+                driver_options, "More drivers ▶"
+            )
         else:
             # Fallback if no valid driver options
             error_options = [
@@ -394,10 +959,21 @@ class DriverSelectView(ui.View):
             self.stop()
             return
 
+        # Show the next page of drivers
+        if selected_value == MORE_OPTIONS_VALUE:
+            next_view = DriverSelectView(
+                self.ea_username,
+                self.team_name,
+                self.driver_options[MAX_SELECT_OPTIONS - 1 :],
+            )
+            await interaction.response.edit_message(view=next_view)
+            self.stop()
+            return
+
         driver = selected_value
 
         # Attempt to save the pick - this will fail if the driver was just selected by someone else
-        success = save_user_pick(
+        success = await asave_user_pick(
             interaction.user.id, self.ea_username, self.team_name, driver
         )
 
@@ -421,20 +997,16 @@ class DriverSelectView(ui.View):
 @bot.event
 async def on_ready():
     print(f"Logged in as {bot.user.name} ({bot.user.id})")
-    # Initialize the database
-    init_database()
-    # Fetch F1 data when the bot is ready
-    await fetch_f1_data()
-    try:
-        synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} command(s).")
-    except Exception as e:
-        print(f"Failed to sync commands: {e}")
 
 
 # The slash command to start the selection process
 @bot.tree.command(name="pick", description="Select your favorite F1 team and driver.")
 async def pick(interaction: Interaction):
+    # A modal must be the first response, within 3 seconds, so /pick never
+    # waits on OpenF1 and answers from whatever data is already loaded
+    await ensure_f1_data_fresh(wait=False)
+    # Pick up picks changed outside the bot, e.g. by db_reset.py
+    await areload_selected_drivers()
     if not F1_TEAMS:
         await interaction.response.send_message(
             "F1 data is not currently available. Please try again in a few moments.",
@@ -443,9 +1015,7 @@ async def pick(interaction: Interaction):
         return
 
     # Check if there are any available drivers left
-    selected_drivers = get_selected_drivers()
-    total_drivers = sum(len(team.get("drivers", [])) for team in F1_TEAMS)
-    available_count = total_drivers - len(selected_drivers)
+    available_count = TOTAL_DRIVERS - len(SELECTED_DRIVERS)
 
     if available_count == 0:
         await interaction.response.send_message(
@@ -465,11 +1035,11 @@ async def pick(interaction: Interaction):
 )
 async def my_pick(interaction: Interaction):
     user_id = interaction.user.id
-    pick = get_user_pick(user_id)
+    pick = await aget_user_pick(user_id)
     if pick:
         embed = discord.Embed(
             title="Your F1 Pick",
-            description=f"**EA Username:** {pick['ea_username']}\n**Team:** {pick['team']}\n**Driver:** {pick['driver']}",
+            description=f"**EA Username:** {pick.ea_username}\n**Team:** {pick.team}\n**Driver:** {pick.driver}",
             color=discord.Color.red(),
         )
         await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -485,24 +1055,23 @@ async def my_pick(interaction: Interaction):
     name="leaderboard", description="View the picks of all users in this server."
 )
 async def leaderboard(interaction: Interaction):
-    all_picks = get_all_picks()
-    if not all_picks:
-        await interaction.response.send_message(
-            "No picks have been made yet. Be the first to use `/pick`!", ephemeral=True
+    # Acknowledge right away so slow database reads don't hit the 3 second
+    # interaction timeout; the result is sent as a followup
+    await interaction.response.defer(ephemeral=False, thinking=True)
+
+    leaderboard_str = await arender_leaderboard()
+    if not leaderboard_str:
+        await interaction.followup.send(
+            "No picks have been made yet. Be the first to use `/pick`!"
         )
         return
 
-    leaderboard_str = ""
-    for user_id, pick in all_picks.items():
-        ea_username = pick.get("ea_username", "Unknown")
-        leaderboard_str += f"**{ea_username}:** {pick['team']} / {pick['driver']}\n"
-
     embed = discord.Embed(
         title="F1 Scuderia Leaderboard",
         description=leaderboard_str,
         color=discord.Color.red(),
     )
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 
 # The slash command to view available drivers
@@ -511,15 +1080,18 @@ async def leaderboard(interaction: Interaction):
     description="View all available drivers that haven't been selected yet.",
 )
 async def available_drivers(interaction: Interaction):
+    # Acknowledge right away since a stale cache means waiting on OpenF1
+    await interaction.response.defer(ephemeral=False, thinking=True)
+
+    await ensure_f1_data_fresh()
+    await areload_selected_drivers()
     if not F1_TEAMS:
-        await interaction.response.send_message(
-            "F1 data is not currently available. Please try again in a few moments.",
-            ephemeral=True,
+        await interaction.followup.send(
+            "F1 data is not currently available. Please try again in a few moments."
         )
         return
 
-    selected_drivers = get_selected_drivers()
-    available_str = ""
+    available_lines = []
     total_available = 0
 
     for team in F1_TEAMS:
@@ -527,11 +1099,13 @@ async def available_drivers(interaction: Interaction):
         available_team_drivers = [
             driver
             for driver in team.get("drivers", [])
-            if driver not in selected_drivers
+            if driver not in SELECTED_DRIVERS
         ]
 
         if available_team_drivers:
-            available_str += f"**{team_name}:** {', '.join(available_team_drivers)}\n"
+            available_lines.append(
+                f"**{team_name}:** {', '.join(available_team_drivers)}"
+            )
             total_available += len(available_team_drivers)
 
     if total_available == 0:
@@ -543,11 +1117,11 @@ async def available_drivers(interaction: Interaction):
     else:
         embed = discord.Embed(
             title=f"Available Drivers ({total_available} remaining)",
-            description=available_str,
+            description="\n".join(available_lines),
             color=discord.Color.green(),
         )
 
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 
 # Run the bot only if this script is executed directly
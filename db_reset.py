@@ -13,6 +13,15 @@ from datetime import datetime
 DB_FILE = "f1_picks.db"
 
 
+def connect_database():
+    """Open the database with the same journal and sync settings as the bot."""
+    conn = sqlite3.connect(DB_FILE)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
 def reset_database():
     """Clear all user picks from the database."""
     if not os.path.exists(DB_FILE):
@@ -20,7 +29,7 @@ def reset_database():
         return False
 
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = connect_database()
         cursor = conn.cursor()
 
         # Get count before deletion
@@ -52,19 +61,14 @@ def show_database_stats():
         return
 
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = connect_database()
         cursor = conn.cursor()
 
-        # Get total picks
-        cursor.execute("SELECT COUNT(*) FROM user_picks")
-        total_picks = cursor.fetchone()[0]
-
-        # Get unique teams and drivers
-        cursor.execute("SELECT COUNT(DISTINCT team) FROM user_picks")
-        unique_teams = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(DISTINCT driver) FROM user_picks")
-        unique_drivers = cursor.fetchone()[0]
+        # Get total picks and unique teams and drivers in one pass
+        cursor.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT team), COUNT(DISTINCT driver) FROM user_picks"
+        )
+        total_picks, unique_teams, unique_drivers = cursor.fetchone()
 
         # Get all picks with timestamps
         cursor.execute(
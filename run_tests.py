@@ -8,12 +8,19 @@ This script runs individual test categories for easier debugging and development
 import os
 import sqlite3
 import sys
-import tempfile
 import unittest
 
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Mock F1 teams data for the filtering tests
+MOCK_F1_TEAMS = [
+    {"name": "Red Bull Racing", "drivers": ["Max Verstappen", "Sergio Perez"]},
+    {"name": "Ferrari", "drivers": ["Charles Leclerc", "Carlos Sainz"]},
+    {"name": "Mercedes", "drivers": ["Lewis Hamilton", "George Russell"]},
+]
+TOTAL_DRIVERS = sum(len(team["drivers"]) for team in MOCK_F1_TEAMS)
+
 
 def test_imports():
     """Test all required imports work"""
@@ -24,9 +31,10 @@ def test_imports():
 
         import aiohttp
         import discord
-        import requests
-        from discord import Interaction, app_commands, ui
-        from discord.ext import commands
+        import orjson
+        from aiolimiter import AsyncLimiter
+        from discord import Interaction, ui
+        from discord.ext import commands, tasks
         from dotenv import load_dotenv
 
         print("✅ All imports successful")
@@ -40,14 +48,11 @@ def test_database_operations():
     """Test database operations with temporary database"""
     print("\n🗄️ Testing database operations...")
 
-    # Create temporary database
-    test_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
-    test_db_path = test_db.name
-    test_db.close()
+    # Use one in-memory database connection for the whole test
+    conn = sqlite3.connect(":memory:")
 
     try:
         # Initialize database
-        conn = sqlite3.connect(test_db_path)
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -61,11 +66,9 @@ def test_database_operations():
         """
         )
         conn.commit()
-        conn.close()
 
         # Test unique driver constraint
-        def save_user_pick(user_id, ea_username, team, driver):
-            conn = sqlite3.connect(test_db_path)
+        def save_user_pick(conn, user_id, ea_username, team, driver):
             cursor = conn.cursor()
 
             cursor.execute(
@@ -75,7 +78,6 @@ def test_database_operations():
             existing_pick = cursor.fetchone()
 
             if existing_pick:
-                conn.close()
                 return False
 
             cursor.execute(
@@ -87,23 +89,22 @@ def test_database_operations():
             )
 
             conn.commit()
-            conn.close()
             return True
 
         # Test 1: First user selects driver
-        result1 = save_user_pick(1, "user1", "Red Bull Racing", "Max Verstappen")
+        result1 = save_user_pick(conn, 1, "user1", "Red Bull Racing", "Max Verstappen")
         print(f"  ✅ First user selecting Max Verstappen: {result1}")
         if result1 != True:
             raise AssertionError("First user should be able to select driver")
 
         # Test 2: Second user tries same driver
-        result2 = save_user_pick(2, "user2", "Red Bull Racing", "Max Verstappen")
+        result2 = save_user_pick(conn, 2, "user2", "Red Bull Racing", "Max Verstappen")
         print(f"  ✅ Second user selecting Max Verstappen: {result2}")
         if result2 != False:
             raise AssertionError("Second user should NOT be able to select same driver")
 
         # Test 3: Second user selects different driver
-        result3 = save_user_pick(2, "user2", "Mercedes", "Lewis Hamilton")
+        result3 = save_user_pick(conn, 2, "user2", "Mercedes", "Lewis Hamilton")
         print(f"  ✅ Second user selecting Lewis Hamilton: {result3}")
         if result3 != True:
             raise AssertionError(
@@ -111,12 +112,8 @@ def test_database_operations():
             )
 
         # Test 4: Get selected drivers
-        conn = sqlite3.connect(test_db_path)
-        cursor = conn.cursor()
         cursor.execute("SELECT driver FROM user_picks")
-        results = cursor.fetchall()
-        selected_drivers = {driver[0] for driver in results}
-        conn.close()
+        selected_drivers = {driver[0] for driver in cursor}
 
         expected = {"Max Verstappen", "Lewis Hamilton"}
         print(f"  ✅ Selected drivers: {selected_drivers}")
@@ -131,7 +128,7 @@ def test_database_operations():
         return False
     finally:
         # Clean up
-        os.unlink(test_db_path)
+        conn.close()
 
 
 def test_driver_filtering_logic():
@@ -139,24 +136,15 @@ def test_driver_filtering_logic():
     print("\n🏎️ Testing driver filtering logic...")
 
     try:
-        # Mock F1 teams data
-        f1_teams = [
-            {"name": "Red Bull Racing", "drivers": ["Max Verstappen", "Sergio Perez"]},
-            {"name": "Ferrari", "drivers": ["Charles Leclerc", "Carlos Sainz"]},
-            {"name": "Mercedes", "drivers": ["Lewis Hamilton", "George Russell"]},
-        ]
-
-        selected_drivers = {"Max Verstappen", "Charles Leclerc"}
+        selected_drivers = frozenset({"Max Verstappen", "Charles Leclerc"})
 
         # Test team filtering
         available_teams = []
-        for team in f1_teams:
-            available_drivers = [
-                d for d in team["drivers"] if d not in selected_drivers
-            ]
-            if available_drivers:
+        for team in MOCK_F1_TEAMS:
+            available_count = len(set(team["drivers"]) - selected_drivers)
+            if available_count:
                 available_teams.append(
-                    {"name": team["name"], "available_count": len(available_drivers)}
+                    {"name": team["name"], "available_count": available_count}
                 )
 
         print(f"  ✅ Teams with available drivers: {len(available_teams)}")
@@ -172,11 +160,10 @@ def test_driver_filtering_logic():
             raise AssertionError("Only Sergio Perez should be available")
 
         # Test total count calculation
-        total_drivers = sum(len(team["drivers"]) for team in f1_teams)
-        available_count = total_drivers - len(selected_drivers)
+        available_count = TOTAL_DRIVERS - len(selected_drivers)
 
-        print(f"  ✅ Total drivers: {total_drivers}, Available: {available_count}")
-        if total_drivers != 6:
+        print(f"  ✅ Total drivers: {TOTAL_DRIVERS}, Available: {available_count}")
+        if TOTAL_DRIVERS != 6:
             raise AssertionError("Should have 6 total drivers")
         if available_count != 4:
             raise AssertionError("Should have 4 available drivers")
@@ -9,9 +9,18 @@ import sqlite3
 DB_FILE = "f1_picks.db"
 
 
+def connect_database():
+    """Open the database with the same journal and sync settings as the bot."""
+    conn = sqlite3.connect(DB_FILE)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
 def init_database():
     """Initialize the SQLite database and create the user_picks table if it doesn't exist."""
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect_database()
     cursor = conn.cursor()
 
     cursor.execute(
@@ -31,21 +40,40 @@ def init_database():
     print("Database initialized successfully.")
 
 
-def save_user_pick(user_id, ea_username, team, driver):
-    """Save or update a user's team, driver pick, and EA username in the database."""
-    conn = sqlite3.connect(DB_FILE)
+def save_user_picks(picks):
+    """
+    Save or update a batch of (user_id, ea_username, team, driver) picks in one
+    transaction. A pick whose driver belongs to another user is skipped rather
+    than replacing that user's row. Returns True for each pick that was saved.
+    """
+    conn = connect_database()
     cursor = conn.cursor()
 
-    cursor.execute(
+    cursor.executemany(
         """
-        INSERT OR REPLACE INTO user_picks (user_id, ea_username, team, driver, updated_at)
-        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        INSERT INTO user_picks (user_id, ea_username, team, driver, updated_at)
+        SELECT ?1, ?2, ?3, ?4, CURRENT_TIMESTAMP
+        WHERE NOT EXISTS (SELECT 1 FROM user_picks WHERE driver = ?4 AND user_id <> ?1)
+        ON CONFLICT(user_id) DO UPDATE SET
+            ea_username = excluded.ea_username,
+            team = excluded.team,
+            driver = excluded.driver,
+            updated_at = CURRENT_TIMESTAMP
     """,
-        (user_id, ea_username, team, driver),
+        picks,
     )
+    # executemany only reports the total rowcount, so read back which users
+    # ended up with the driver they asked for
+    saved_drivers = dict(cursor.execute("SELECT user_id, driver FROM user_picks"))
 
     conn.commit()
     conn.close()
+    return [saved_drivers.get(user_id) == driver for user_id, _, _, driver in picks]
+
+
+def save_user_pick(user_id, ea_username, team, driver):
+    """Save or update a user's team, driver pick, and EA username in the database."""
+    return save_user_picks([(user_id, ea_username, team, driver)])[0]
 
 
 def seed_leaderboard_data():
@@ -66,16 +94,25 @@ def seed_leaderboard_data():
 
     print("Seeding database with leaderboard data...")
 
-    for user_id, ea_username, team, driver in seed_data:
-        save_user_pick(user_id, ea_username, team, driver)
-        print(f"Added pick for {ea_username} (ID: {user_id}): {team} / {driver}")
+    results = save_user_picks(seed_data)
+    print(
+        "\n".join(
+            (
+                f"Added pick for {ea_username} (ID: {user_id}): {team} / {driver}"
+                if saved
+                else f"Skipped {ea_username} (ID: {user_id}): {driver} is already picked by another user"
+            )
+            for (user_id, ea_username, team, driver), saved in zip(seed_data, results)
+        )
+    )
 
-    print(f"\nSuccessfully seeded {len(seed_data)} user picks!")
+    saved_count = sum(results)
+    print(f"\nSuccessfully seeded {saved_count} user picks!")
 
 
 def verify_data():
     """Verify that the data was inserted correctly."""
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect_database()
     cursor = conn.cursor()
 
     cursor.execute("SELECT COUNT(*) FROM user_picks")
@@ -91,8 +128,12 @@ def verify_data():
     print(f"\nDatabase verification:")
     print(f"Total picks in database: {count}")
     print("\nAll picks:")
-    for user_id, ea_username, team, driver in all_picks:
-        print(f"  {ea_username} (ID: {user_id}): {team} / {driver}")
+    print(
+        "\n".join(
+            f"  {ea_username} (ID: {user_id}): {team} / {driver}"
+            for user_id, ea_username, team, driver in all_picks
+        )
+    )
 
 
 if __name__ == "__main__":
@@ -8,279 +8,247 @@ This test suite covers:
 - Edge cases and error handling
 """
 
+import json
 import os
 import sqlite3
 import sys
 import tempfile
+import time
 import unittest
-from unittest.mock import MagicMock, patch
+from collections import Counter
+from unittest.mock import AsyncMock, MagicMock, patch
 
 # Add the current directory to Python path to import bot modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from test_config import ALL_DRIVERS, DRIVER_TO_TEAM, EXPECTED_RESULTS
+
+# The bot's dependencies, imported once; TestBotImports reports any failure
+try:
+    import asyncio
+
+    import aiohttp
+    import discord
+    import orjson
+    from aiolimiter import AsyncLimiter
+    from discord import Interaction, ui
+    from discord.ext import commands, tasks
+    from dotenv import load_dotenv
+
+    import bot
+
+    IMPORT_ERR = None
+except ImportError as e:
+    IMPORT_ERR = e
+
+# Test database schema, matching the main app
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS user_picks (
+        user_id INTEGER PRIMARY KEY,
+        team TEXT NOT NULL,
+        driver TEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        ea_username TEXT NOT NULL
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_user_picks_driver ON user_picks(driver);
+    CREATE INDEX IF NOT EXISTS idx_user_picks_updated ON user_picks(updated_at DESC);
+"""
 
-class TestDatabaseFunctions(unittest.TestCase):
-    """Test database operations and unique driver constraints"""
-
-    def setUp(self):
-        """Set up a temporary test database for each test"""
-        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
-        self.test_db_path = self.test_db.name
-        self.test_db.close()
-
-        # Initialize test database with same schema as main app
-        conn = sqlite3.connect(self.test_db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS user_picks (
-                user_id INTEGER PRIMARY KEY,
-                team TEXT NOT NULL,
-                driver TEXT NOT NULL,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ea_username TEXT NOT NULL
-            )
-        """
-        )
-        conn.commit()
-        conn.close()
-
-    def tearDown(self):
-        """Clean up test database"""
-        os.unlink(self.test_db_path)
 
-    def save_user_pick(self, user_id, ea_username, team, driver):
-        """Test version of save_user_pick using test database"""
-        conn = sqlite3.connect(self.test_db_path)
-        cursor = conn.cursor()
+class SchemaTestCase(unittest.TestCase):
+    """Base class sharing one in-memory database per class, rolled back after each test"""
 
-        # Check if the driver is already selected by another user
-        cursor.execute(
-            "SELECT user_id FROM user_picks WHERE driver = ? AND user_id != ?",
-            (driver, user_id),
-        )
-        existing_pick = cursor.fetchone()
+    @classmethod
+    def setUpClass(cls):
+        """Create the database with SCHEMA_SQL once for the whole class"""
+        # Autocommit mode, so only the per-test savepoint opens a transaction
+        cls.conn = sqlite3.connect(":memory:", isolation_level=None)
+        cls.conn.executescript(SCHEMA_SQL)
 
-        if existing_pick:
-            conn.close()
-            return False  # Driver already taken by another user
+    @classmethod
+    def tearDownClass(cls):
+        """Close the shared database"""
+        cls.conn.close()
 
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO user_picks (user_id, ea_username, team, driver, updated_at)
-            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-        """,
-            (user_id, ea_username, team, driver),
-        )
-
-        conn.commit()
-        conn.close()
-        return True  # Successfully saved
-
-    def get_selected_drivers(self):
-        """Test version of get_selected_drivers using test database"""
-        conn = sqlite3.connect(self.test_db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT driver FROM user_picks")
-        results = cursor.fetchall()
-        conn.close()
-        return {driver[0] for driver in results}
-
-    def get_all_picks(self):
-        """Test version of get_all_picks using test database"""
-        conn = sqlite3.connect(self.test_db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT user_id, team, driver, ea_username FROM user_picks ORDER BY updated_at DESC"
-        )
-        results = cursor.fetchall()
-        conn.close()
+    def setUp(self):
+        """Start a savepoint so the test's changes can be undone"""
+        self.conn.execute("SAVEPOINT test")
 
-        picks = {}
-        for user_id, team, driver, ea_username in results:
-            picks[user_id] = {
-                "ea_username": ea_username,
-                "team": team,
-                "driver": driver,
-            }
-        return picks
+    def tearDown(self):
+        """Roll the database back to how it was before the test"""
+        self.conn.execute("ROLLBACK TO test")
+        self.conn.execute("RELEASE test")
 
-    def get_user_pick(self, user_id):
-        """Test version of get_user_pick using test database"""
-        conn = sqlite3.connect(self.test_db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT team, driver, ea_username FROM user_picks WHERE user_id = ?",
-            (user_id,),
-        )
-        result = cursor.fetchone()
-        conn.close()
 
-        if result:
-            return {"team": result[0], "driver": result[1], "ea_username": result[2]}
-        return None
+class BotDatabaseTestCase(unittest.TestCase):
+    """Base class running the bot's own database helpers on a temporary file"""
 
-    def test_unique_driver_constraint(self):
+    def setUp(self):
+        """Point bot.DB_FILE at a fresh database and open it"""
+        if IMPORT_ERR:
+            self.skipTest(f"Imports failed: {IMPORT_ERR}")
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_path = tmp_dir.name
+        db_patch = patch.object(bot, "DB_FILE", os.path.join(tmp_dir.name, "picks.db"))
+        db_patch.start()
+        self.addCleanup(db_patch.stop)
+        bot.init_database()
+        self.addCleanup(self.close_database)
+
+    def close_database(self):
+        """Close the connection opened by init_database"""
+        bot.DB_CONN.close()
+        bot.DB_CONN = None
+
+    def clear_picks(self):
+        """Empty user_picks and reload SELECTED_DRIVERS to match"""
+        with bot.DB_LOCK:
+            bot.DB_CONN.execute("DELETE FROM user_picks")
+        # The bot's own writes don't bump data_version, so force the reload
+        bot.SELECTED_DRIVERS_DATA_VERSION = None
+        bot.reload_selected_drivers()
+
+
+class TestDatabaseFunctions(BotDatabaseTestCase):
+    """Test the bot's database operations and unique driver constraints"""
+
+    def test_user_pick_behaviors(self):
+        """Test saving, changing and reading user picks on one shared database"""
+        cases = {
+            "unique constraint": self.check_unique_driver_constraint,
+            "change pick": self.check_user_can_change_pick,
+            "selected drivers": self.check_get_selected_drivers,
+            "leaderboard": self.check_render_leaderboard,
+            "user pick": self.check_get_user_pick,
+        }
+        for case, check in cases.items():
+            with self.subTest(case=case):
+                # Each case starts from an empty table
+                try:
+                    check()
+                finally:
+                    self.clear_picks()
+
+    def check_unique_driver_constraint(self):
         """Test that drivers can only be selected once"""
         # First user selects Max Verstappen
-        result1 = self.save_user_pick(1, "user1", "Red Bull Racing", "Max Verstappen")
+        result1 = bot.save_user_pick(1, "user1", "Red Bull Racing", "Max Verstappen")
         self.assertTrue(result1, "First user should be able to select Max Verstappen")
 
         # Second user tries to select the same driver
-        result2 = self.save_user_pick(2, "user2", "Red Bull Racing", "Max Verstappen")
+        result2 = bot.save_user_pick(2, "user2", "Red Bull Racing", "Max Verstappen")
         self.assertFalse(
             result2, "Second user should NOT be able to select Max Verstappen"
         )
 
         # Second user selects a different driver
-        result3 = self.save_user_pick(2, "user2", "Mercedes", "Lewis Hamilton")
+        result3 = bot.save_user_pick(2, "user2", "Mercedes", "Lewis Hamilton")
         self.assertTrue(result3, "Second user should be able to select Lewis Hamilton")
 
-    def test_user_can_change_pick(self):
+        # Second user tries to switch to the taken driver
+        result4 = bot.save_user_pick(2, "user2", "Red Bull Racing", "Max Verstappen")
+        self.assertFalse(
+            result4, "Second user should NOT be able to switch to a taken driver"
+        )
+        self.assertEqual(bot.get_user_pick(1).driver, "Max Verstappen")
+        self.assertEqual(bot.get_user_pick(2).driver, "Lewis Hamilton")
+
+    def check_user_can_change_pick(self):
         """Test that users can change their own pick"""
         # User selects initial driver
-        result1 = self.save_user_pick(1, "user1", "Ferrari", "Charles Leclerc")
+        result1 = bot.save_user_pick(1, "user1", "Ferrari", "Charles Leclerc")
         self.assertTrue(result1, "User should be able to make initial selection")
 
         # User changes to different driver
-        result2 = self.save_user_pick(1, "user1", "Mercedes", "George Russell")
+        result2 = bot.save_user_pick(1, "user1", "Mercedes", "George Russell")
         self.assertTrue(result2, "User should be able to change their selection")
 
         # Verify the change was saved
-        pick = self.get_user_pick(1)
+        pick = bot.get_user_pick(1)
         self.assertEqual(
-            pick["driver"],
+            pick.driver,
             "George Russell",
             "Driver should be updated to George Russell",
         )
-        self.assertEqual(pick["team"], "Mercedes", "Team should be updated to Mercedes")
+        self.assertEqual(pick.team, "Mercedes", "Team should be updated to Mercedes")
 
-    def test_get_selected_drivers(self):
+    def check_get_selected_drivers(self):
         """Test retrieving all selected drivers"""
         # Add some test data
-        self.save_user_pick(1, "user1", "Ferrari", "Charles Leclerc")
-        self.save_user_pick(2, "user2", "Mercedes", "Lewis Hamilton")
-        self.save_user_pick(3, "user3", "Red Bull Racing", "Max Verstappen")
+        bot.save_user_pick(1, "user1", "Ferrari", "Charles Leclerc")
+        bot.save_user_pick(2, "user2", "Mercedes", "Lewis Hamilton")
+        bot.save_user_pick(3, "user3", "Red Bull Racing", "Max Verstappen")
 
-        selected = self.get_selected_drivers()
+        selected = bot.get_selected_drivers()
         expected = {"Charles Leclerc", "Lewis Hamilton", "Max Verstappen"}
         self.assertEqual(selected, expected, f"Selected drivers should be {expected}")
+        self.assertEqual(
+            bot.SELECTED_DRIVERS, expected, "Mirror should match the table"
+        )
 
-    def test_get_all_picks(self):
-        """Test retrieving all user picks"""
+    def check_render_leaderboard(self):
+        """Test rendering every user pick on the leaderboard"""
         # Add test data
-        self.save_user_pick(1, "testuser1", "Ferrari", "Charles Leclerc")
-        self.save_user_pick(2, "testuser2", "Mercedes", "Lewis Hamilton")
-
-        picks = self.get_all_picks()
+        bot.save_user_pick(1, "testuser1", "Ferrari", "Charles Leclerc")
+        bot.save_user_pick(2, "testuser2", "Mercedes", "Lewis Hamilton")
 
-        self.assertEqual(len(picks), 2, "Should have 2 picks")
-        self.assertIn(1, picks, "User 1 should be in picks")
-        self.assertIn(2, picks, "User 2 should be in picks")
+        lines = bot.render_leaderboard().split("\n")
 
-        self.assertEqual(picks[1]["ea_username"], "testuser1")
-        self.assertEqual(picks[1]["team"], "Ferrari")
-        self.assertEqual(picks[1]["driver"], "Charles Leclerc")
+        self.assertEqual(len(lines), 2, "Should have 2 picks")
+        self.assertIn("**testuser1:** Ferrari / Charles Leclerc", lines)
+        self.assertIn("**testuser2:** Mercedes / Lewis Hamilton", lines)
 
-    def test_get_user_pick(self):
+    def check_get_user_pick(self):
         """Test retrieving a specific user's pick"""
         # User with no pick
-        pick = self.get_user_pick(999)
+        pick = bot.get_user_pick(999)
         self.assertIsNone(pick, "Non-existent user should return None")
 
         # User with a pick
-        self.save_user_pick(1, "testuser", "McLaren", "Lando Norris")
-        pick = self.get_user_pick(1)
+        bot.save_user_pick(1, "testuser", "McLaren", "Lando Norris")
+        pick = bot.get_user_pick(1)
 
         self.assertIsNotNone(pick, "User should have a pick")
-        self.assertEqual(pick["ea_username"], "testuser")
-        self.assertEqual(pick["team"], "McLaren")
-        self.assertEqual(pick["driver"], "Lando Norris")
+        self.assertEqual(pick.ea_username, "testuser")
+        self.assertEqual(pick.team, "McLaren")
+        self.assertEqual(pick.driver, "Lando Norris")
 
 
 class TestBotImports(unittest.TestCase):
     """Test that all required modules can be imported"""
 
-    def test_discord_imports(self):
-        """Test Discord.py imports"""
-        try:
-            import discord
-            from discord import Interaction, app_commands, ui
-            from discord.ext import commands
-
-            self.assertTrue(True, "Discord imports successful")
-        except ImportError as e:
-            self.fail(f"Discord imports failed: {e}")
-
-    def test_standard_library_imports(self):
-        """Test standard library imports"""
-        try:
-            import asyncio
-            import os
-            import sqlite3
-
-            self.assertTrue(True, "Standard library imports successful")
-        except ImportError as e:
-            self.fail(f"Standard library imports failed: {e}")
-
-    def test_third_party_imports(self):
-        """Test third-party library imports"""
-        try:
-            import aiohttp
-            import requests
-            from dotenv import load_dotenv
-
-            self.assertTrue(True, "Third-party imports successful")
-        except ImportError as e:
-            self.fail(f"Third-party imports failed: {e}")
+    def test_imports(self):
+        """Test Discord.py, standard library and third-party imports"""
+        self.assertIsNone(IMPORT_ERR, f"Imports failed: {IMPORT_ERR}")
 
 
 class TestBotFunctionality(unittest.TestCase):
     """Test bot functionality without actually running Discord client"""
 
-    def setUp(self):
-        """Set up test environment"""
-        # Mock F1_TEAMS data for testing
-        self.mock_f1_teams = [
-            {"name": "Red Bull Racing", "drivers": ["Max Verstappen", "Sergio Perez"]},
-            {"name": "Ferrari", "drivers": ["Charles Leclerc", "Carlos Sainz"]},
-            {"name": "Mercedes", "drivers": ["Lewis Hamilton", "George Russell"]},
-        ]
-
     def test_team_filtering_logic(self):
         """Test logic for filtering teams with available drivers"""
-        selected_drivers = {"Max Verstappen", "Charles Leclerc"}
+        selected_drivers = frozenset({"Max Verstappen", "Charles Leclerc"})
 
-        # Simulate filtering logic
-        available_teams = []
-        for team in self.mock_f1_teams:
-            available_drivers = [
-                d for d in team["drivers"] if d not in selected_drivers
-            ]
-            if available_drivers:
-                available_teams.append(
-                    {
-                        "name": team["name"],
-                        "available_count": len(available_drivers),
-                        "available_drivers": available_drivers,
-                    }
-                )
+        # Simulate filtering logic on the flat driver -> team lookup
+        available_drivers = ALL_DRIVERS - selected_drivers
+        available_counts = Counter(DRIVER_TO_TEAM[d] for d in available_drivers)
 
         self.assertEqual(
-            len(available_teams), 3, "All teams should have some available drivers"
+            len(available_counts),
+            EXPECTED_RESULTS["total_teams"],
+            "All teams should have some available drivers",
         )
 
         # Red Bull should have 1 available (Sergio Perez)
-        red_bull = next(t for t in available_teams if t["name"] == "Red Bull Racing")
-        self.assertEqual(red_bull["available_count"], 1)
-        self.assertIn("Sergio Perez", red_bull["available_drivers"])
-        self.assertNotIn("Max Verstappen", red_bull["available_drivers"])
+        self.assertEqual(available_counts["Red Bull Racing"], 1)
+        self.assertIn("Sergio Perez", available_drivers)
+        self.assertNotIn("Max Verstappen", available_drivers)
 
         # Ferrari should have 1 available (Carlos Sainz)
-        ferrari = next(t for t in available_teams if t["name"] == "Ferrari")
-        self.assertEqual(ferrari["available_count"], 1)
-        self.assertIn("Carlos Sainz", ferrari["available_drivers"])
-        self.assertNotIn("Charles Leclerc", ferrari["available_drivers"])
+        self.assertEqual(available_counts["Ferrari"], 1)
+        self.assertIn("Carlos Sainz", available_drivers)
+        self.assertNotIn("Charles Leclerc", available_drivers)
 
     def test_driver_availability_check(self):
         """Test driver availability checking logic"""
@@ -296,83 +264,54 @@ class TestBotFunctionality(unittest.TestCase):
 
     def test_all_drivers_taken_scenario(self):
         """Test scenario where all drivers are taken"""
-        all_drivers = []
-        for team in self.mock_f1_teams:
-            all_drivers.extend(team["drivers"])
-
-        selected_drivers = set(all_drivers)  # All drivers selected
+        selected_drivers = ALL_DRIVERS  # All drivers selected
 
         # Check if any teams have available drivers
-        available_teams = []
-        for team in self.mock_f1_teams:
-            available_drivers = [
-                d for d in team["drivers"] if d not in selected_drivers
-            ]
-            if available_drivers:
-                available_teams.append(team)
+        available_counts = Counter(
+            DRIVER_TO_TEAM[d] for d in ALL_DRIVERS - selected_drivers
+        )
 
         self.assertEqual(
-            len(available_teams), 0, "No teams should have available drivers"
+            len(available_counts), 0, "No teams should have available drivers"
         )
 
     def test_driver_count_calculation(self):
         """Test calculation of total and available driver counts"""
-        total_drivers = sum(len(team["drivers"]) for team in self.mock_f1_teams)
+        total_drivers = len(ALL_DRIVERS)
         selected_drivers = {"Max Verstappen", "Charles Leclerc"}
         available_count = total_drivers - len(selected_drivers)
 
-        self.assertEqual(total_drivers, 6, "Should have 6 total drivers")
-        self.assertEqual(available_count, 4, "Should have 4 available drivers")
+        self.assertEqual(
+            total_drivers,
+            EXPECTED_RESULTS["total_drivers"],
+            "Should have 10 total drivers",
+        )
+        self.assertEqual(
+            available_count,
+            EXPECTED_RESULTS["min_available_after_selection"],
+            "Should have 8 available drivers",
+        )
 
 
-class TestEdgeCases(unittest.TestCase):
+class TestEdgeCases(SchemaTestCase):
     """Test edge cases and error scenarios"""
 
-    def setUp(self):
-        """Set up test database"""
-        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
-        self.test_db_path = self.test_db.name
-        self.test_db.close()
-
-        # Initialize test database
-        conn = sqlite3.connect(self.test_db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS user_picks (
-                user_id INTEGER PRIMARY KEY,
-                team TEXT NOT NULL,
-                driver TEXT NOT NULL,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ea_username TEXT NOT NULL
-            )
-        """
-        )
-        conn.commit()
-        conn.close()
-
-    def tearDown(self):
-        """Clean up test database"""
-        os.unlink(self.test_db_path)
-
     def test_empty_database(self):
         """Test functions with empty database"""
-        conn = sqlite3.connect(self.test_db_path)
+        conn = self.conn
         cursor = conn.cursor()
 
         # Test get_selected_drivers with empty database
         cursor.execute("SELECT driver FROM user_picks")
-        results = cursor.fetchall()
-        selected = {driver[0] for driver in results}
+        selected = {driver[0] for driver in cursor}
         self.assertEqual(len(selected), 0, "Empty database should return empty set")
 
         # Test get_all_picks with empty database
         cursor.execute(
             "SELECT user_id, team, driver, ea_username FROM user_picks ORDER BY updated_at DESC"
         )
-        results = cursor.fetchall()
         picks = {}
-        for user_id, team, driver, ea_username in results:
+        for user_id, team, driver, ea_username in cursor:
             picks[user_id] = {
                 "ea_username": ea_username,
                 "team": team,
@@ -380,7 +319,6 @@ class TestEdgeCases(unittest.TestCase):
             }
 
         self.assertEqual(len(picks), 0, "Empty database should return empty picks dict")
-        conn.close()
 
     def test_database_connection_error(self):
         """Test handling of database connection errors"""
@@ -397,7 +335,7 @@ class TestEdgeCases(unittest.TestCase):
 
     def test_duplicate_user_id_update(self):
         """Test updating existing user pick (same user_id)"""
-        conn = sqlite3.connect(self.test_db_path)
+        conn = self.conn
         cursor = conn.cursor()
 
         # Insert initial pick
@@ -408,7 +346,6 @@ class TestEdgeCases(unittest.TestCase):
         """,
             (1, "testuser", "Ferrari", "Charles Leclerc"),
         )
-        conn.commit()
 
         # Update same user's pick
         cursor.execute(
@@ -418,7 +355,6 @@ class TestEdgeCases(unittest.TestCase):
         """,
             (1, "testuser", "Mercedes", "Lewis Hamilton"),
         )
-        conn.commit()
 
         # Verify only one record exists for this user
         cursor.execute("SELECT COUNT(*) FROM user_picks WHERE user_id = ?", (1,))
@@ -431,7 +367,500 @@ class TestEdgeCases(unittest.TestCase):
         self.assertEqual(result[0], "Mercedes", "Team should be updated")
         self.assertEqual(result[1], "Lewis Hamilton", "Driver should be updated")
 
-        conn.close()
+
+class TestBotPickQueue(BotDatabaseTestCase):
+    """Test the bot's batched pick writes against a temporary database file"""
+
+    def run_with_queue(self, coro_func):
+        """Run coro_func() on a new event loop with a fresh PICK_QUEUE"""
+
+        async def runner():
+            bot.PICK_QUEUE = asyncio.Queue()
+            try:
+                return await coro_func()
+            finally:
+                bot.PICK_QUEUE = None
+
+        return asyncio.run(runner())
+
+    def test_batch_conflicts(self):
+        """Test that picks in one batch see the picks saved before them"""
+        picks = [
+            (1, "user1", "Ferrari", "Charles Leclerc"),
+            (2, "user2", "Ferrari", "Charles Leclerc"),  # Taken by user 1
+            (1, "user1", "McLaren", "Lando Norris"),  # Frees Charles Leclerc
+            (2, "user2", "Ferrari", "Charles Leclerc"),
+        ]
+        before = bot.SELECTED_DRIVERS
+        self.assertEqual(bot.save_user_picks(picks), [True, False, True, True])
+        # The set read by the event loop is replaced, never changed in place
+        self.assertEqual(before, frozenset())
+        self.assertIsNot(bot.SELECTED_DRIVERS, before)
+
+        self.assertEqual(bot.get_user_pick(1).driver, "Lando Norris")
+        self.assertEqual(bot.get_user_pick(2).driver, "Charles Leclerc")
+        # SELECTED_DRIVERS mirrors the committed rows
+        self.assertEqual(bot.SELECTED_DRIVERS, {"Lando Norris", "Charles Leclerc"})
+        self.assertFalse(
+            bot.reload_selected_drivers(), "Own writes shouldn't force a reload"
+        )
+
+    def test_flush_resolves_futures(self):
+        """Test that flush_picks answers every queued pick with its own result"""
+
+        async def scenario():
+            pick_tasks = [
+                asyncio.create_task(
+                    bot.asave_user_pick(1, "user1", "Ferrari", "Charles Leclerc")
+                ),
+                asyncio.create_task(
+                    bot.asave_user_pick(2, "user2", "Ferrari", "Charles Leclerc")
+                ),
+            ]
+            await asyncio.sleep(0)  # Let both picks reach the queue
+            await bot.flush_picks()
+            return await asyncio.gather(*pick_tasks)
+
+        self.assertEqual(self.run_with_queue(scenario), [True, False])
+        self.assertEqual(bot.SELECTED_DRIVERS, {"Charles Leclerc"})
+
+    def test_flush_failure_propagates(self):
+        """Test that a failed batch write raises in every waiting caller"""
+
+        async def scenario():
+            pick_tasks = [
+                asyncio.create_task(
+                    bot.asave_user_pick(1, "user1", "Ferrari", "Charles Leclerc")
+                ),
+                asyncio.create_task(
+                    bot.asave_user_pick(2, "user2", "McLaren", "Lando Norris")
+                ),
+            ]
+            await asyncio.sleep(0)
+            error = sqlite3.OperationalError("database is locked")
+            with patch.object(bot, "save_user_picks", side_effect=error):
+                await bot.flush_picks()
+            return await asyncio.gather(*pick_tasks, return_exceptions=True)
+
+        results = self.run_with_queue(scenario)
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertIsInstance(result, sqlite3.OperationalError)
+        self.assertIsNone(bot.get_user_pick(1), "Nothing should have been saved")
+
+    def test_close_drains_queue(self):
+        """Test that closing the bot writes the picks still waiting in the queue"""
+
+        async def scenario():
+            # More than one batch, so close() has to flush repeatedly
+            count = bot.PICK_BATCH_SIZE + 1
+            pick_tasks = [
+                asyncio.create_task(
+                    bot.asave_user_pick(i, f"user{i}", "Team", f"Driver {i}")
+                )
+                for i in range(count)
+            ]
+            await asyncio.sleep(0)
+            self.assertEqual(bot.PICK_QUEUE.qsize(), count)
+            with patch.object(commands.Bot, "close", new=AsyncMock()):
+                await bot.bot.close()
+            self.assertTrue(bot.PICK_QUEUE.empty())
+            return await asyncio.gather(*pick_tasks)
+
+        results = self.run_with_queue(scenario)
+        self.assertEqual(results, [True] * (bot.PICK_BATCH_SIZE + 1))
+        self.assertEqual(len(bot.get_selected_drivers()), bot.PICK_BATCH_SIZE + 1)
+
+
+class StubSession:
+    """
+    Stand-in for the bot's aiohttp session. Each get() plays the next reply:
+    an exception to raise, an HTTP error status, or a (body, headers) pair.
+    replies is a list, or a dict of lists keyed by URL.
+    """
+
+    def __init__(self, replies):
+        if not isinstance(replies, dict):
+            replies = {None: replies}
+        self.replies = {url: list(queue) for url, queue in replies.items()}
+        self.requests = []
+        self.open_responses = 0
+
+    @property
+    def calls(self):
+        return len(self.requests)
+
+    def get(self, url, params=None):
+        self.requests.append((url, params))
+        queue = self.replies[url if url in self.replies else None]
+        return StubResponse(self, queue.pop(0))
+
+
+class StubResponse:
+    """Async context manager behaving like a response from raise_for_status=True"""
+
+    def __init__(self, session, reply):
+        self.session = session
+        self.reply = reply
+        self.headers = {}
+
+    async def __aenter__(self):
+        if isinstance(self.reply, BaseException):
+            raise self.reply
+        if isinstance(self.reply, tuple) and isinstance(self.reply[0], int):
+            status, headers = self.reply
+            raise aiohttp.ClientResponseError(
+                MagicMock(), (), status=status, message="error", headers=headers
+            )
+        self.body, self.headers = self.reply
+        self.session.open_responses += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.session.open_responses -= 1
+
+    async def read(self):
+        return orjson.dumps(self.body)
+
+
+class TestOpenF1Retry(unittest.TestCase):
+    """Test the retry policy of bot.fetch_openf1_json with a stub session"""
+
+    def setUp(self):
+        """Record sleeps instead of waiting, and drop the random jitter"""
+        if IMPORT_ERR:
+            self.skipTest(f"Imports failed: {IMPORT_ERR}")
+        self.sleeps = []
+        patches = [
+            patch.object(bot.asyncio, "sleep", new=self.fake_sleep),
+            patch.object(bot.random, "uniform", return_value=0),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def fake_sleep(self, delay):
+        self.sleeps.append((delay, self.session.open_responses))
+
+    def fetch(self, replies):
+        """Run fetch_openf1_json against the given replies"""
+        self.session = StubSession(replies)
+
+        async def runner():
+            # A limiter belongs to one event loop, so each run gets its own
+            with patch.object(bot, "OPENF1_LIMITER", AsyncLimiter(1000, 1)):
+                return await bot.fetch_openf1_json(self.session, "https://openf1", {})
+
+        return asyncio.run(runner())
+
+    def test_retryable_failures(self):
+        """Test that rate limits, server errors and timeouts are retried"""
+        data = self.fetch(
+            [
+                (503, {}),
+                (429, {"Retry-After": "10"}),
+                asyncio.TimeoutError(),
+                ([{"meeting_key": 1}], {}),
+            ]
+        )
+        self.assertEqual(data, [{"meeting_key": 1}])
+        self.assertEqual(self.session.calls, 4)
+        # Exponential backoff, stretched to Retry-After on the 429
+        self.assertEqual([delay for delay, _ in self.sleeps], [2, 10, 8])
+
+    def test_client_error_not_retried(self):
+        """Test that a 4xx other than 429 is raised straight away"""
+        with self.assertRaises(aiohttp.ClientResponseError) as ctx:
+            self.fetch([(404, {})])
+        self.assertEqual(ctx.exception.status, 404)
+        self.assertEqual(self.session.calls, 1)
+        self.assertEqual(self.sleeps, [])
+
+    def test_last_attempt_reraises(self):
+        """Test that the error is raised once every attempt has failed"""
+        attempts = bot.OPENF1_MAX_ATTEMPTS
+        with self.assertRaises(aiohttp.ClientResponseError) as ctx:
+            self.fetch([(500, {})] * attempts)
+        self.assertEqual(ctx.exception.status, 500)
+        self.assertEqual(self.session.calls, attempts)
+        self.assertEqual(len(self.sleeps), attempts - 1)
+
+    def test_low_quota_backoff(self):
+        """Test the x-ratelimit-remaining backoff after a successful request"""
+        cases = [
+            ({"x-ratelimit-remaining": "1", "Retry-After": "3"}, [(3, 0)]),
+            ({"x-ratelimit-remaining": "0"}, [(1.0, 0)]),
+            ({"x-ratelimit-remaining": "5"}, []),
+            ({}, []),
+        ]
+        for headers, expected_sleeps in cases:
+            with self.subTest(headers=headers):
+                self.sleeps = []
+                self.assertEqual(self.fetch([([], headers)]), [])
+                # The second value is 0 when the response was released before sleeping
+                self.assertEqual(self.sleeps, expected_sleeps)
+
+
+class F1DataTestCase(BotDatabaseTestCase):
+    """Base class giving each test its own F1 data cache and cache file"""
+
+    def setUp(self):
+        """Swap in an empty F1_TEAMS and point F1_CACHE_FILE at the temp dir"""
+        super().setUp()
+        patches = [
+            patch.object(bot, "F1_TEAMS", bot.F1DataCache()),
+            patch.object(bot, "F1_TEAMS_BY_NAME", {}),
+            patch.object(bot, "TOTAL_DRIVERS", 0),
+            patch.object(bot, "TEAM_SELECT_OPTIONS", {}),
+            patch.object(bot, "DRIVER_OPTIONS_BY_TEAM", {}),
+            patch.object(
+                bot, "F1_CACHE_FILE", os.path.join(self.tmp_path, "f1_cache.json")
+            ),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+
+class TestF1DataFetch(F1DataTestCase):
+    """Test how bot.fetch_f1_data reuses the cached meeting key"""
+
+    @staticmethod
+    def drivers(*names):
+        """OpenF1 driver rows for McLaren drivers with the given names"""
+        return [
+            {"team_name": "McLaren", "first_name": first, "last_name": last}
+            for first, last in (name.split() for name in names)
+        ]
+
+    def store_meeting_key(self, key, age_seconds):
+        """Cache a meeting key as if it had been looked up age_seconds ago"""
+        with bot.DB_LOCK:
+            bot.DB_CONN.execute(
+                bot.SQL_SET_META, ("meeting_key", key, int(time.time() - age_seconds))
+            )
+
+    def fetch(self, replies):
+        """Run fetch_f1_data against the given replies, keyed by URL"""
+        self.session = StubSession(replies)
+
+        async def runner():
+            with patch.object(bot, "OPENF1_LIMITER", AsyncLimiter(1000, 1)):
+                await bot.fetch_f1_data(self.session)
+
+        asyncio.run(runner())
+
+    def driver_names(self):
+        return [driver for team in bot.F1_TEAMS for driver in team["drivers"]]
+
+    def test_fresh_meeting_key(self):
+        """Test that a recent meeting key skips the meetings lookup"""
+        self.store_meeting_key("1262", 60)
+        self.fetch({bot.OPENF1_DRIVERS_URL: [(self.drivers("Lando Norris"), {})]})
+
+        self.assertEqual(
+            self.session.requests, [(bot.OPENF1_DRIVERS_URL, {"meeting_key": 1262})]
+        )
+        self.assertEqual(self.driver_names(), ["Lando Norris"])
+
+    def test_expired_key_same_meeting(self):
+        """Test that the speculative drivers are kept when the meeting is unchanged"""
+        self.store_meeting_key("1262", bot.MEETING_KEY_TTL_SECONDS + 60)
+        self.fetch(
+            {
+                bot.OPENF1_MEETINGS_URL: [([{"meeting_key": 1262}], {})],
+                bot.OPENF1_DRIVERS_URL: [(self.drivers("Lando Norris"), {})],
+            }
+        )
+
+        self.assertEqual(self.session.calls, 2, "No second drivers request")
+        self.assertEqual(self.driver_names(), ["Lando Norris"])
+        value, ts = bot.get_meta("meeting_key")
+        self.assertEqual(value, "1262")
+        self.assertGreater(ts, time.time() - 60, "The key's timestamp is renewed")
+
+    def test_expired_key_new_meeting(self):
+        """Test that the speculative drivers are dropped when the meeting changed"""
+        self.store_meeting_key("1262", bot.MEETING_KEY_TTL_SECONDS + 60)
+        self.fetch(
+            {
+                bot.OPENF1_MEETINGS_URL: [([{"meeting_key": 1263}], {})],
+                bot.OPENF1_DRIVERS_URL: [
+                    (self.drivers("Lando Norris"), {}),
+                    (self.drivers("Oscar Piastri"), {}),
+                ],
+            }
+        )
+
+        self.assertEqual(
+            self.session.requests[-1], (bot.OPENF1_DRIVERS_URL, {"meeting_key": 1263})
+        )
+        self.assertEqual(self.driver_names(), ["Oscar Piastri"])
+        self.assertEqual(bot.get_meta("meeting_key")[0], "1263")
+
+    def test_failed_speculative_request(self):
+        """Test that the drivers are fetched again if the speculative request failed"""
+        self.store_meeting_key("1262", bot.MEETING_KEY_TTL_SECONDS + 60)
+        self.fetch(
+            {
+                bot.OPENF1_MEETINGS_URL: [([{"meeting_key": 1262}], {})],
+                bot.OPENF1_DRIVERS_URL: [(404, {}), (self.drivers("Lando Norris"), {})],
+            }
+        )
+
+        self.assertEqual(self.session.calls, 3)
+        self.assertEqual(self.driver_names(), ["Lando Norris"])
+
+    def test_null_meeting_key(self):
+        """Test that a missing meeting key is neither used nor stored"""
+        self.fetch({bot.OPENF1_MEETINGS_URL: [([{"meeting_key": None}], {})]})
+
+        self.assertEqual(self.session.calls, 1, "No drivers request for a null key")
+        self.assertIsNone(bot.get_meta("meeting_key"))
+        self.assertEqual(len(bot.F1_TEAMS), 0)
+
+
+class TestF1DataCache(F1DataTestCase):
+    """Test loading the on-disk F1 cache and deciding when to refresh it"""
+
+    TEAMS = [{"name": "McLaren", "drivers": ["Lando Norris", "Oscar Piastri"]}]
+
+    def write_cache(self, content):
+        """Write content to the cache file, as JSON unless it is a string"""
+        if not isinstance(content, str):
+            content = json.dumps(content)
+        with open(bot.F1_CACHE_FILE, "w", encoding="utf-8") as cache_file:
+            cache_file.write(content)
+
+    def test_missing_cache(self):
+        """Test that a missing cache file leaves the data unloaded"""
+        bot.load_f1_cache()
+        self.assertEqual(len(bot.F1_TEAMS), 0)
+        self.assertIsNone(bot.F1_TEAMS.age())
+
+    def test_malformed_cache(self):
+        """Test that a malformed cache file is ignored instead of raising"""
+        cases = {
+            "not json": "{",
+            "no teams": {"ts": time.time()},
+            "no timestamp": {"teams": self.TEAMS},
+            "drivers not a list": {
+                "ts": time.time(),
+                "teams": [{"name": "McLaren", "drivers": "Lando Norris"}],
+            },
+            "team without name": {"ts": time.time(), "teams": [{"drivers": []}]},
+        }
+        for case, content in cases.items():
+            with self.subTest(case=case):
+                self.write_cache(content)
+                bot.load_f1_cache()
+                self.assertEqual(len(bot.F1_TEAMS), 0)
+
+    def test_valid_cache_keeps_age(self):
+        """Test that a loaded cache is as old as when it was written"""
+        self.write_cache({"ts": time.time() - 3600, "teams": self.TEAMS})
+        bot.load_f1_cache()
+
+        self.assertEqual([team["name"] for team in bot.F1_TEAMS], ["McLaren"])
+        self.assertEqual(bot.TOTAL_DRIVERS, 2)
+        self.assertAlmostEqual(bot.F1_TEAMS.age(), 3600, delta=5)
+        self.assertFalse(bot.F1_TEAMS.is_stale(), "An hour old is within the TTL")
+
+    def test_stale_data_refresh(self):
+        """Test when ensure_f1_data_fresh refreshes in the background or inline"""
+        cases = [
+            # (data age, wait, refreshed inline)
+            (bot.F1_DATA_TTL_SECONDS + 60, True, False),
+            (bot.F1_DATA_MAX_AGE_SECONDS + 60, False, False),
+            (bot.F1_DATA_MAX_AGE_SECONDS + 60, True, True),
+        ]
+        for age_seconds, wait, inline in cases:
+            with self.subTest(age_seconds=age_seconds, wait=wait):
+                bot.set_f1_teams(
+                    [dict(team) for team in self.TEAMS], age_seconds=age_seconds
+                )
+                with patch.object(
+                    bot, "coalesced_fetch_f1_data", new=AsyncMock()
+                ) as fetch, patch.object(bot, "start_background_refresh") as start:
+                    asyncio.run(bot.ensure_f1_data_fresh(wait=wait))
+                self.assertEqual(fetch.await_count, int(inline))
+                self.assertEqual(start.call_count, int(not inline))
+
+    def test_fresh_data_not_refreshed(self):
+        """Test that data within the TTL triggers no refresh at all"""
+        bot.set_f1_teams([dict(team) for team in self.TEAMS])
+        with patch.object(
+            bot, "coalesced_fetch_f1_data", new=AsyncMock()
+        ) as fetch, patch.object(bot, "start_background_refresh") as start:
+            asyncio.run(bot.ensure_f1_data_fresh(wait=False))
+        fetch.assert_not_awaited()
+        start.assert_not_called()
+
+
+class TestSelectPagination(F1DataTestCase):
+    """Test that team and driver menus with more than 25 options are paginated"""
+
+    def open_pages(self, make_view, select_name):
+        """Build the first page with make_view() and pick its "more" entry"""
+
+        async def scenario():
+            view = make_view()
+            interaction = MagicMock()
+            interaction.response.edit_message = AsyncMock()
+            select = MagicMock(values=[bot.MORE_OPTIONS_VALUE])
+            await getattr(type(view), select_name)(view, interaction, select)
+            return view, interaction.response.edit_message.call_args.kwargs["view"]
+
+        # Views can only be created on a running event loop
+        return asyncio.run(scenario())
+
+    def test_more_than_25_options(self):
+        """Test the 24 options plus "more" entry and the slicing of the next page"""
+        teams = [
+            {"name": f"Team {i:02}", "drivers": [f"Driver {i:02}"]} for i in range(30)
+        ]
+        teams.append({"name": "Grid", "drivers": [f"Grid {i:02}" for i in range(30)]})
+        bot.set_f1_teams(teams)
+
+        cases = {
+            "teams": (
+                lambda: bot.TeamSelectView("user"),
+                "team_select_callback",
+                "team_options",
+                "More teams ▶",
+                31,
+            ),
+            "drivers": (
+                lambda: bot.DriverSelectView("user", "Grid"),
+                "driver_select_callback",
+                "driver_options",
+                "More drivers ▶",
+                30,
+            ),
+        }
+        for case, (
+            make_view,
+            select_name,
+            options_name,
+            more_label,
+            count,
+        ) in cases.items():
+            with self.subTest(case=case):
+                view, next_view = self.open_pages(make_view, select_name)
+                all_options = getattr(view, options_name)
+                self.assertEqual(len(all_options), count)
+
+                shown = getattr(view, select_name).options
+                self.assertEqual(len(shown), bot.MAX_SELECT_OPTIONS)
+                self.assertEqual(shown[:24], all_options[:24])
+                self.assertEqual(shown[-1].label, more_label)
+                self.assertEqual(shown[-1].value, bot.MORE_OPTIONS_VALUE)
+
+                # The next page gets the rest, which fit without another "more"
+                self.assertEqual(getattr(next_view, options_name), all_options[24:])
+                self.assertEqual(
+                    getattr(next_view, select_name).options, all_options[24:]
+                )
 
 
 def run_tests():
@@ -445,6 +874,11 @@ def run_tests():
         TestBotImports,
         TestBotFunctionality,
         TestEdgeCases,
+        TestBotPickQueue,
+        TestOpenF1Retry,
+        TestF1DataFetch,
+        TestF1DataCache,
+        TestSelectPagination,
     ]
 
     for test_class in test_classes:
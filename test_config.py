@@ -13,6 +13,12 @@ MOCK_F1_TEAMS = [
     {"name": "Aston Martin", "drivers": ["Fernando Alonso", "Lance Stroll"]},
 ]
 
+# Flat driver -> team lookup, so tests can filter drivers with set operations
+DRIVER_TO_TEAM = {
+    driver: team["name"] for team in MOCK_F1_TEAMS for driver in team["drivers"]
+}
+ALL_DRIVERS = frozenset(DRIVER_TO_TEAM)
+
 # Test User Data
 MOCK_USERS = [
     {